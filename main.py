@@ -1,16 +1,23 @@
+import asyncio
 import os
-import random
+import re
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set, Tuple
 
-from fastapi import FastAPI, Query
+import numpy as np
+import orjson
+from cachetools import TTLCache
+from fastapi import FastAPI, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter
+from typing_extensions import TypedDict
 
 from database import db, create_document
 from bson import ObjectId
+from pymongo import ReturnDocument, WriteConcern
 
-app = FastAPI(title="Price Compare API")
+app = FastAPI(title="Price Compare API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,11 +31,14 @@ app.add_middleware(
 # -----------------------------
 # Models
 # -----------------------------
-class PricePoint(BaseModel):
+class PricePoint(TypedDict):
+    # Plain dict so generated history needs no model round trip before insert
     date: datetime
     price: float
 
 class PlatformPrice(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     platform: str
     price: float
     currency: str = "INR"
@@ -39,6 +49,8 @@ class PlatformPrice(BaseModel):
     history: List[PricePoint] = Field(default_factory=list)
 
 class ProductResult(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     id: str
     name: str
     brand: Optional[str] = None
@@ -47,12 +59,18 @@ class ProductResult(BaseModel):
     platforms: List[PlatformPrice]
 
 class SearchResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
     query: str
     results: List[ProductResult]
     filters: Dict[str, Any]
     generated_at: datetime
 
 
+# Built once so per-request validation of price lists is a single core call
+_PLATFORM_ADAPTER = TypeAdapter(List[PlatformPrice])
+
+
 # -----------------------------
 # Catalogs & Utilities
 # -----------------------------
@@ -66,6 +84,9 @@ PLATFORMS = [
     "Croma",
 ]
 
+# Host slugs for platform URLs, e.g. "Tata Cliq" -> "tatacliq"
+PLATFORM_SLUGS = tuple(p.replace(" ", "").lower() for p in PLATFORMS)
+
 CATEGORIES = [
     "Mobiles",
     "Headphones",
@@ -88,125 +109,371 @@ SAMPLE_IMAGES = [
     "https://images.unsplash.com/photo-1512496015851-a90fb38ba796?w=800",
 ]
 
+DELIVERY_OPTIONS = ["2-3 days", "Next day", "Standard (3-5 days)"]
+
+TRENDING_NAMES = [
+    "iPhone 15", "Samsung Galaxy S23", "Sony WH-1000XM5",
+    "Nike Air Max", "Dell XPS 13", "MacBook Air M2"
+]
+TRENDING_BRANDS = ["Apple", "Samsung", "Sony", "Nike", "Dell", "Apple"]  # duplicate to bias
+TRENDING_CATEGORIES = ["Mobiles", "Headphones", "Shoes", "Laptops"]
+
+
+_WS_RE = re.compile(r"\s+")
+
 
 def normalize(text: str) -> str:
-    return " ".join(text.lower().strip().split())
+    return _WS_RE.sub(" ", text.strip().lower())
+
+
+# One generator per worker process; bulk draws run in compiled code
+_rng = np.random.default_rng()
+
+# Seeded price entries are regenerable demo data, so skip the write acknowledgement
+seed_priceentry = db["priceentry"].with_options(write_concern=WriteConcern(w=0)) if db is not None else None
+
 
+def rand_prices(base: float, n: int) -> List[float]:
+    """n independent prices within +/-15% of base, drawn in a single call"""
+    return (base * _rng.uniform(0.85, 1.15, n)).round(2).tolist()
 
-def rand_price(base: float) -> float:
-    variance = base * 0.15
-    return round(random.uniform(base - variance, base + variance), 2)
 
+def _pick(seq: List[Any], size: int) -> List[Any]:
+    return [seq[i] for i in _rng.integers(0, len(seq), size).tolist()]
 
-def make_history(base: float, days: int = 14) -> List[PricePoint]:
-    pts = []
-    cur = base
-    for i in range(days, -1, -1):
-        cur = max(100.0, rand_price(cur))
-        pts.append(PricePoint(date=datetime.now(timezone.utc) - timedelta(days=i), price=cur))
-    return pts
 
+HISTORY_DAYS = 14
+_HISTORY_DELTAS = tuple(timedelta(days=i) for i in range(HISTORY_DAYS, -1, -1))
 
-def ensure_product_in_db(name: str, brand: Optional[str], category: Optional[str]) -> Dict[str, Any]:
+
+def make_history(base: float, now: datetime, days: int = HISTORY_DAYS) -> List[PricePoint]:
+    deltas = _HISTORY_DELTAS if days == HISTORY_DAYS else [timedelta(days=i) for i in range(days, -1, -1)]
+    # Random walk of +/-15% steps, drawn and accumulated in one pass
+    walk = base * np.cumprod(_rng.uniform(0.85, 1.15, days + 1))
+    prices = np.maximum(walk, 100.0).round(2).tolist()
+    return [{"date": now - delta, "price": price} for delta, price in zip(deltas, prices)]
+
+
+async def ensure_product_in_db(
+    name: str, brand: Optional[str], category: Optional[str]
+) -> Tuple[Dict[str, Any], Optional[List[Dict[str, Any]]]]:
+    """Product document, plus its price entries when this call just seeded them"""
     norm = normalize(name)
-    existing = db["product"].find_one({"normalized_name": norm}) if db else None
-    if existing:
-        return existing
+    now = datetime.now(timezone.utc)
     # Create new sample product
     doc = {
         "name": name,
         "normalized_name": norm,
         "brand": brand,
         "category": category or "General",
-        "image": random.choice(SAMPLE_IMAGES),
-        "created_at": datetime.now(timezone.utc),
-        "updated_at": datetime.now(timezone.utc),
+        "image": _pick(SAMPLE_IMAGES, 1)[0],
+        "created_at": now,
+        "updated_at": now,
     }
     if db is None:
         # fallback without DB
-        return doc
-    inserted_id = db["product"].insert_one(doc).inserted_id
+        return doc, None
+    # Lookup and insert in one round trip: the upsert only writes when no
+    # product matches, and returns whichever document ends up stored
+    inserted_id = ObjectId()
     doc["_id"] = inserted_id
+    stored = await db["product"].find_one_and_update(
+        {"normalized_name": norm},
+        {"$setOnInsert": doc},
+        upsert=True,
+        return_document=ReturnDocument.AFTER,
+    )
+    if stored["_id"] != inserted_id:
+        return stored, None
     # Seed platform prices
-    base = random.uniform(499, 49999)
+    seeded = make_price_entries(str(inserted_id), norm, now)
+    await seed_priceentry.insert_many(seeded, ordered=False)
+    return stored, seeded
+
+
+def make_price_entries(product_id: str, norm: str, now: datetime) -> List[Dict[str, Any]]:
+    n = len(PLATFORMS)
+    prices = rand_prices(_rng.uniform(499, 49999), n)
+    ratings = _rng.uniform(3.5, 5.0, n).round(1).tolist()
+    deliveries = _pick(DELIVERY_OPTIONS, n)
     seeded = []
-    for p in PLATFORMS:
-        price = rand_price(base)
-        pp = {
-            "product_id": str(inserted_id),
+    for p, slug, price, rating, delivery in zip(PLATFORMS, PLATFORM_SLUGS, prices, ratings, deliveries):
+        seeded.append({
+            "product_id": product_id,
             "platform": p,
             "price": price,
             "currency": "INR",
-            "url": f"https://{p.replace(' ', '').lower()}.com/search?q={norm}",
-            "rating": round(random.uniform(3.5, 5.0), 1),
-            "delivery": random.choice(["2-3 days", "Next day", "Standard (3-5 days)"]),
-            "last_updated": datetime.now(timezone.utc),
-            "history": [h.model_dump() for h in make_history(price)],
-            "created_at": datetime.now(timezone.utc),
-            "updated_at": datetime.now(timezone.utc),
-        }
-        seeded.append(pp)
-    if seeded:
-        db["priceentry"].insert_many(seeded)
-    return doc
-
-
-def find_or_generate_prices(product_doc: Dict[str, Any]) -> List[Dict[str, Any]]:
+            "url": f"https://{slug}.com/search?q={norm}",
+            "rating": rating,
+            "delivery": delivery,
+            "last_updated": now,
+            "history": make_history(price, now),
+            "created_at": now,
+            "updated_at": now,
+        })
+    return seeded
+
+
+def in_price_range(price: float, price_min: Optional[float], price_max: Optional[float]) -> bool:
+    if price_min is not None and price < price_min:
+        return False
+    if price_max is not None and price > price_max:
+        return False
+    return True
+
+
+def select_prices(
+    entries: List[Dict[str, Any]],
+    price_min: Optional[float],
+    price_max: Optional[float],
+    include_history: bool,
+) -> List[Dict[str, Any]]:
+    """Filter in-memory price entries the way the priceentry query would"""
+    items = [p for p in entries if in_price_range(p["price"], price_min, price_max)]
+    if not include_history:
+        items = [{k: v for k, v in p.items() if k != "history"} for p in items]
+    return items
+
+
+async def find_or_generate_prices(
+    product_doc: Dict[str, Any],
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    include_history: bool = True,
+) -> List[Dict[str, Any]]:
+    """Price entries for the product whose price lies within [price_min, price_max]"""
+    now = datetime.now(timezone.utc)
     if db is None or ("_id" not in product_doc):
         # Generate ephemeral data
-        base = random.uniform(499, 49999)
+        n = len(PLATFORMS)
+        prices = rand_prices(_rng.uniform(499, 49999), n)
+        ratings = _rng.uniform(3.5, 5.0, n).round(1).tolist()
+        deliveries = _pick(DELIVERY_OPTIONS, n)
         out = []
-        for p in PLATFORMS:
-            price = rand_price(base)
+        for p, slug, price, rating, delivery in zip(PLATFORMS, PLATFORM_SLUGS, prices, ratings, deliveries):
             out.append({
                 "platform": p,
                 "price": price,
                 "currency": "INR",
-                "url": f"https://{p.replace(' ', '').lower()}.com",
-                "rating": round(random.uniform(3.5, 5.0), 1),
-                "delivery": random.choice(["2-3 days", "Next day", "Standard (3-5 days)"]),
-                "last_updated": datetime.now(timezone.utc),
-                "history": [h.model_dump() for h in make_history(price)],
+                "url": f"https://{slug}.com",
+                "rating": rating,
+                "delivery": delivery,
+                "last_updated": now,
+                "history": make_history(price, now) if include_history else [],
             })
-        return out
-    # Pull from DB
-    items = list(db["priceentry"].find({"product_id": str(product_doc["_id"]) }))
+        return [p for p in out if in_price_range(p["price"], price_min, price_max)]
+    # Pull from DB, letting Mongo apply the price range on the (product_id, price) index
+    product_id = str(product_doc["_id"])
+    query: Dict[str, Any] = {"product_id": product_id}
+    price_clause: Dict[str, float] = {}
+    if price_min is not None:
+        price_clause["$gte"] = price_min
+    if price_max is not None:
+        price_clause["$lte"] = price_max
+    if price_clause:
+        query["price"] = price_clause
+    projection = None if include_history else {"history": 0}
+    items = await db["priceentry"].find(query, projection=projection).to_list(length=None)
+    if not items and price_clause:
+        # Nothing in range; only seed if the product has no entries at all.
+        # Projecting just product_id lets the (product_id, price) index cover the probe
+        if await db["priceentry"].find_one({"product_id": product_id}, projection={"_id": 0, "product_id": 1}):
+            return items
     # if empty, seed now
     if not items:
-        base = random.uniform(499, 49999)
-        seeded = []
-        for p in PLATFORMS:
-            price = rand_price(base)
-            pp = {
-                "product_id": str(product_doc["_id"]),
-                "platform": p,
-                "price": price,
+        seeded = make_price_entries(product_id, product_doc.get("normalized_name", ""), now)
+        await seed_priceentry.insert_many(seeded, ordered=False)
+        items = select_prices(seeded, price_min, price_max, include_history)
+    return items
+
+
+def generate_trending(limit: int) -> Dict[str, Any]:
+    # Draw every random input in bulk up front
+    limit = max(limit, 0)
+    now = datetime.now(timezone.utc)
+    k = min(4, len(PLATFORMS))
+    names = _pick(TRENDING_NAMES, limit)
+    brands = _pick(TRENDING_BRANDS, limit)
+    categories = _pick(TRENDING_CATEGORIES, limit)
+    images = _pick(SAMPLE_IMAGES, limit)
+    bases = _rng.uniform(999, 149999, limit)
+    # Per-row shuffle of platform indices == random.sample(PLATFORMS, k) for each item
+    platform_idx = _rng.permuted(np.tile(np.arange(len(PLATFORMS)), (limit, 1)), axis=1)[:, :k].tolist()
+    prices = (bases[:, None] * _rng.uniform(0.85, 1.15, (limit, k))).round(2).tolist()
+    items = []
+    for i in range(limit):
+        name = names[i]
+        platform_prices = []
+        lowest = None
+        for j, pr in zip(platform_idx[i], prices[i]):
+            entry = {
+                "platform": PLATFORMS[j],
+                "price": pr,
                 "currency": "INR",
-                "url": f"https://{p.replace(' ', '').lower()}.com/search?q={product_doc.get('normalized_name','')}",
-                "rating": round(random.uniform(3.5, 5.0), 1),
-                "delivery": random.choice(["2-3 days", "Next day", "Standard (3-5 days)"]),
-                "last_updated": datetime.now(timezone.utc),
-                "history": [h.model_dump() for h in make_history(price)],
-                "created_at": datetime.now(timezone.utc),
-                "updated_at": datetime.now(timezone.utc),
+                "url": f"https://{PLATFORM_SLUGS[j]}.com/search?q={name}",
+                "last_updated": now,
             }
-            seeded.append(pp)
-        if seeded:
-            db["priceentry"].insert_many(seeded)
-            items = seeded
+            platform_prices.append(entry)
+            if lowest is None or pr < lowest["price"]:
+                lowest = entry
+        items.append({
+            "name": name,
+            "brand": brands[i],
+            "category": categories[i],
+            "image": images[i],
+            "platforms": platform_prices,
+            "lowest": lowest,
+        })
+    return {"items": items, "generated_at": now}
+
+
+async def sample_trending_products(size: int) -> List[Dict[str, Any]]:
+    """Randomly sampled curated products with their platform prices, joined server-side"""
+    pipeline = [
+        # Only products explicitly flagged for the homepage; /api/search upserts
+        # whatever users type, so the rest of the collection is not trusted here
+        {"$match": {"trending": True}},
+        {"$sample": {"size": size}},
+        {"$lookup": {
+            "from": "priceentry",
+            # priceentry.product_id holds the stringified product _id
+            "let": {"pid": {"$toString": "$_id"}},
+            "pipeline": [
+                {"$match": {"$expr": {"$eq": ["$product_id", "$$pid"]}}},
+                {"$project": {"_id": 0, "platform": 1, "price": 1, "currency": 1, "url": 1, "last_updated": 1}},
+            ],
+            "as": "platforms",
+        }},
+        {"$match": {"platforms.0": {"$exists": True}}},
+        {"$project": {"_id": 0, "name": 1, "brand": 1, "category": 1, "image": 1, "platforms": 1}},
+    ]
+    items = await db["product"].aggregate(pipeline).to_list(length=size)
+    for item in items:
+        lowest = None
+        for entry in item["platforms"]:
+            if lowest is None or entry["price"] < lowest["price"]:
+                lowest = entry
+        item["lowest"] = lowest
     return items
 
 
+# -----------------------------
+# Background tasks
+# -----------------------------
+# Strong references so fire-and-forget tasks are not garbage collected mid-flight
+_background_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _log_search(record: Dict[str, Any]) -> None:
+    try:
+        await create_document("searchrecord", record)
+    except Exception:
+        pass
+
+
+TRENDING_POOL_SIZE = 24
+TRENDING_REFRESH_SECONDS = 60
+_trending_cache: Optional[Dict[str, Any]] = None
+# Encoded responses for the current pool, keyed by limit; replaced on every refresh
+_trending_bodies: Dict[int, bytes] = {}
+_trending_task: Optional[asyncio.Task] = None
+
+
+async def _build_trending_pool() -> Dict[str, Any]:
+    items: List[Dict[str, Any]] = []
+    if db is not None:
+        try:
+            items = await sample_trending_products(TRENDING_POOL_SIZE)
+        except Exception:
+            items = []
+    # Top up with generated deals until enough curated products have prices
+    pool = generate_trending(TRENDING_POOL_SIZE - len(items))
+    pool["items"] = items + pool["items"]
+    return pool
+
+
+async def _refresh_trending() -> None:
+    global _trending_cache, _trending_bodies
+    while True:
+        pool = await _build_trending_pool()
+        _trending_cache, _trending_bodies = pool, {}
+        await asyncio.sleep(TRENDING_REFRESH_SECONDS)
+
+
+# -----------------------------
+# Response caches
+# -----------------------------
+_catalog_cache: TTLCache = TTLCache(maxsize=4, ttl=60)
+_catalog_lock = asyncio.Lock()
+_recent_cache: TTLCache = TTLCache(maxsize=32, ttl=5)
+_recent_lock = asyncio.Lock()
+
+
+async def _cached_json(cache: TTLCache, lock: asyncio.Lock, key: Any, build) -> Response:
+    """Serve a cached JSON body, building it at most once per miss"""
+    body = cache.get(key)
+    if body is None:
+        # Double-checked so a burst of misses triggers a single rebuild
+        async with lock:
+            body = cache.get(key)
+            if body is None:
+                body = orjson.dumps(await build())
+                cache[key] = body
+    return Response(content=body, media_type="application/json")
+
+
+# -----------------------------
+# Startup
+# -----------------------------
+@app.on_event("startup")
+async def ensure_indexes():
+    if db is None:
+        return
+    try:
+        await asyncio.gather(
+            db["product"].create_index("normalized_name", unique=True),
+            db["product"].create_index("trending", partialFilterExpression={"trending": True}),
+            db["priceentry"].create_index([("product_id", 1), ("price", 1)]),
+            db["searchrecord"].create_index([("created_at", -1)]),
+        )
+    except Exception:
+        # Serve requests even if an index cannot be built (e.g. legacy duplicates)
+        pass
+
+
+@app.on_event("startup")
+async def start_trending_refresh():
+    global _trending_task
+    _trending_task = asyncio.create_task(_refresh_trending())
+
+
+@app.on_event("shutdown")
+async def stop_trending_refresh():
+    if _trending_task is not None:
+        _trending_task.cancel()
+
+
 # -----------------------------
 # Routes
 # -----------------------------
 @app.get("/")
-def read_root():
+async def read_root():
     return {"message": "Price Compare Backend running"}
 
 
 @app.get("/api/catalogs")
-def get_catalogs():
+async def get_catalogs():
+    return await _cached_json(_catalog_cache, _catalog_lock, "catalogs", _build_catalogs)
+
+
+async def _build_catalogs() -> Dict[str, Any]:
     return {
         "categories": CATEGORIES,
         "brands": BRANDS,
@@ -216,40 +483,32 @@ def get_catalogs():
 
 
 @app.get("/api/search", response_model=SearchResponse)
-def search_products(
+async def search_products(
     q: str = Query(..., description="Product name to search"),
     category: Optional[str] = None,
     brand: Optional[str] = None,
     price_min: Optional[float] = None,
     price_max: Optional[float] = None,
+    include_history: bool = Query(True, description="Include each platform's price history"),
 ):
     # Ensure product exists (seed DB if empty)
-    product_doc = ensure_product_in_db(q, brand, category)
+    product_doc, seeded = await ensure_product_in_db(q, brand, category)
 
-    # Gather prices
-    prices = find_or_generate_prices(product_doc)
-
-    # Apply price range filters
-    if price_min is not None or price_max is not None:
-        def in_range(v: float) -> bool:
-            if price_min is not None and v < price_min:
-                return False
-            if price_max is not None and v > price_max:
-                return False
-            return True
-        prices = [p for p in prices if in_range(p["price"])]
+    # Gather prices within the requested range; fresh seeds are used as-is
+    # since their unacknowledged insert may not be readable yet
+    if seeded is not None:
+        prices = select_prices(seeded, price_min, price_max, include_history)
+    else:
+        prices = await find_or_generate_prices(product_doc, price_min, price_max, include_history)
 
     # Build response result
     result = ProductResult(
-        id=str(product_doc.get("_id", ObjectId())),
+        id=str(product_doc["_id"]) if "_id" in product_doc else "",
         name=product_doc.get("name", q),
         brand=product_doc.get("brand"),
         category=product_doc.get("category"),
         image=product_doc.get("image"),
-        platforms=[PlatformPrice(**{
-            **p,
-            "last_updated": p["last_updated"] if isinstance(p["last_updated"], datetime) else datetime.fromisoformat(str(p["last_updated"]))
-        }) for p in prices]
+        platforms=_PLATFORM_ADAPTER.validate_python(prices)
     )
 
     response = SearchResponse(
@@ -264,30 +523,44 @@ def search_products(
         generated_at=datetime.now(timezone.utc)
     )
 
-    # Persist search record (if DB available)
-    try:
-        if db is not None:
-            create_document("searchrecord", {
-                "query": q,
-                "brand": brand,
-                "category": category,
-                "price_min": price_min,
-                "price_max": price_max,
-                "results_count": len(result.platforms),
-            })
-    except Exception:
-        pass
+    # Persist search record (if DB available) without holding up the response
+    if db is not None:
+        _spawn(_log_search({
+            "query": q,
+            "brand": brand,
+            "category": category,
+            "price_min": price_min,
+            "price_max": price_max,
+            "results_count": len(result.platforms),
+        }))
 
-    return response
+    # Already validated on construction; skip response_model re-validation
+    return ORJSONResponse(response.model_dump())
 
 
 @app.get("/api/search/recent")
-def recent_searches(limit: int = 8):
+async def recent_searches(limit: int = 8):
+    return await _cached_json(_recent_cache, _recent_lock, limit, lambda: _build_recent_searches(limit))
+
+
+RECENT_SEARCH_FIELDS = {
+    "_id": 0,
+    "query": 1,
+    "brand": 1,
+    "category": 1,
+    "price_min": 1,
+    "price_max": 1,
+    "results_count": 1,
+    "created_at": 1,
+}
+
+
+async def _build_recent_searches(limit: int) -> Dict[str, Any]:
     items: List[Dict[str, Any]] = []
     if db is not None:
         try:
-            cursor = db["searchrecord"].find({}).sort("created_at", -1).limit(limit)
-            for doc in cursor:
+            docs = await db["searchrecord"].find({}, projection=RECENT_SEARCH_FIELDS).sort("created_at", -1).limit(limit).to_list(length=limit)
+            for doc in docs:
                 items.append({
                     "query": doc.get("query"),
                     "brand": doc.get("brand"),
@@ -311,41 +584,21 @@ def recent_searches(limit: int = 8):
 
 
 @app.get("/api/trending")
-def trending_deals(limit: int = 6):
-    # Generate or pull deals
-    items = []
-    for _ in range(limit):
-        name = random.choice([
-            "iPhone 15", "Samsung Galaxy S23", "Sony WH-1000XM5",
-            "Nike Air Max", "Dell XPS 13", "MacBook Air M2"
-        ])
-        brand = random.choice(["Apple", "Samsung", "Sony", "Nike", "Dell", "Apple"])  # duplicate to bias
-        category = random.choice(["Mobiles", "Headphones", "Shoes", "Laptops"])
-        base = random.uniform(999, 149999)
-        platform_prices = []
-        for p in random.sample(PLATFORMS, k=min(4, len(PLATFORMS))):
-            pr = rand_price(base)
-            platform_prices.append({
-                "platform": p,
-                "price": pr,
-                "currency": "INR",
-                "url": f"https://{p.replace(' ', '').lower()}.com/search?q={name}",
-                "last_updated": datetime.now(timezone.utc),
-            })
-        lowest = min(platform_prices, key=lambda x: x["price"]) if platform_prices else None
-        items.append({
-            "name": name,
-            "brand": brand,
-            "category": category,
-            "image": random.choice(SAMPLE_IMAGES),
-            "platforms": platform_prices,
-            "lowest": lowest,
-        })
-    return {"items": items, "generated_at": datetime.now(timezone.utc)}
+async def trending_deals(limit: int = 6):
+    # Serve from the periodically refreshed pool; generate on demand past its size
+    limit = max(limit, 0)
+    cached = _trending_cache
+    if cached is None or limit > len(cached["items"]):
+        return generate_trending(limit)
+    body = _trending_bodies.get(limit)
+    if body is None:
+        body = orjson.dumps({"items": cached["items"][:limit], "generated_at": cached["generated_at"]})
+        _trending_bodies[limit] = body
+    return Response(content=body, media_type="application/json")
 
 
 @app.get("/test")
-def test_database():
+async def test_database():
     response = {
         "backend": "✅ Running",
         "database": "❌ Not Available",
@@ -361,7 +614,7 @@ def test_database():
             response["database_name"] = db.name if hasattr(db, 'name') else "✅ Connected"
             response["connection_status"] = "Connected"
             try:
-                collections = db.list_collection_names()
+                collections = await db.list_collection_names()
                 response["collections"] = collections[:10]
                 response["database"] = "✅ Connected & Working"
             except Exception as e:
@@ -374,4 +627,12 @@ def test_database():
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Workers need an import string; each runs the (idempotent) startup hooks
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 2)),
+    )
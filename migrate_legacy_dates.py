@@ -0,0 +1,36 @@
+"""
+Legacy Date Migration
+
+One-off script that converts priceentry.last_updated values stored as
+strings into BSON dates. Every write path stores a native datetime, so
+run this once against databases that hold older rows:
+
+    python migrate_legacy_dates.py
+
+Values that cannot be parsed are left as they are and reported.
+"""
+
+import asyncio
+
+from database import db
+
+LEGACY_FILTER = {"last_updated": {"$type": "string"}}
+
+
+async def migrate() -> None:
+    if db is None:
+        raise Exception("Database not available. Check DATABASE_URL and DATABASE_NAME environment variables.")
+
+    result = await db["priceentry"].update_many(
+        LEGACY_FILTER,
+        [{"$set": {"last_updated": {
+            # onError keeps an unparseable value instead of failing the whole update
+            "$convert": {"input": "$last_updated", "to": "date", "onError": "$last_updated"},
+        }}}],
+    )
+    remaining = await db["priceentry"].count_documents(LEGACY_FILTER)
+    print(f"Matched {result.matched_count}, converted {result.matched_count - remaining}, unparseable {remaining}")
+
+
+if __name__ == "__main__":
+    asyncio.run(migrate())